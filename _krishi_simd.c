@@ -0,0 +1,67 @@
+/*
+ * AVX2 brown/dark pixel counter used by ai_krishi_rakshak.detect_pests.
+ *
+ * Build next to ai_krishi_rakshak.py:
+ *     cc -O3 -mavx2 -mpopcnt -shared -fPIC -o _krishi_simd.so _krishi_simd.c
+ *
+ * Takes planar R/G/B buffers (see _split_planes) and counts, in one pass:
+ *     brown: r > 100 && g < 80 && b < 60
+ *     dark:  r + g + b < 150   (== mean < 50)
+ * Without -mavx2 only the scalar loop is compiled.
+ */
+#include <stddef.h>
+#include <stdint.h>
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
+
+void count_damage(const uint8_t *r, const uint8_t *g, const uint8_t *b, size_t n,
+                  uint64_t *brown, uint64_t *dark)
+{
+    uint64_t brown_cnt = 0;
+    uint64_t dark_cnt = 0;
+    size_t i = 0;
+
+#ifdef __AVX2__
+    const __m256i r_min = _mm256_set1_epi8((char)101);
+    const __m256i g_max = _mm256_set1_epi8(79);
+    const __m256i b_max = _mm256_set1_epi8(59);
+    const __m256i dark_lim = _mm256_set1_epi16(150);
+
+    for (; i + 32 <= n; i += 32) {
+        __m256i vr = _mm256_loadu_si256((const __m256i *)(r + i));
+        __m256i vg = _mm256_loadu_si256((const __m256i *)(g + i));
+        __m256i vb = _mm256_loadu_si256((const __m256i *)(b + i));
+
+        /* AVX2 byte compares are signed; max/min + cmpeq gives the unsigned tests. */
+        __m256i is_r = _mm256_cmpeq_epi8(_mm256_max_epu8(vr, r_min), vr); /* r >= 101 */
+        __m256i is_g = _mm256_cmpeq_epi8(_mm256_min_epu8(vg, g_max), vg); /* g <= 79 */
+        __m256i is_b = _mm256_cmpeq_epi8(_mm256_min_epu8(vb, b_max), vb); /* b <= 59 */
+        __m256i brown_mask = _mm256_and_si256(_mm256_and_si256(is_r, is_g), is_b);
+        brown_cnt += (uint64_t)__builtin_popcount((unsigned)_mm256_movemask_epi8(brown_mask));
+
+        /* r + g + b needs 10 bits: widen each 16-byte half to 16-bit lanes. */
+        __m256i sum_lo = _mm256_add_epi16(
+            _mm256_add_epi16(_mm256_cvtepu8_epi16(_mm256_castsi256_si128(vr)),
+                             _mm256_cvtepu8_epi16(_mm256_castsi256_si128(vg))),
+            _mm256_cvtepu8_epi16(_mm256_castsi256_si128(vb)));
+        __m256i sum_hi = _mm256_add_epi16(
+            _mm256_add_epi16(_mm256_cvtepu8_epi16(_mm256_extracti128_si256(vr, 1)),
+                             _mm256_cvtepu8_epi16(_mm256_extracti128_si256(vg, 1))),
+            _mm256_cvtepu8_epi16(_mm256_extracti128_si256(vb, 1)));
+        __m256i dark_lo = _mm256_cmpgt_epi16(dark_lim, sum_lo);
+        __m256i dark_hi = _mm256_cmpgt_epi16(dark_lim, sum_hi);
+        /* Each 16-bit lane sets two movemask bits. */
+        dark_cnt += ((uint64_t)__builtin_popcount((unsigned)_mm256_movemask_epi8(dark_lo)) +
+                     (uint64_t)__builtin_popcount((unsigned)_mm256_movemask_epi8(dark_hi))) / 2;
+    }
+#endif
+
+    for (; i < n; i++) {
+        brown_cnt += (r[i] > 100) & (g[i] < 80) & (b[i] < 60);
+        dark_cnt += (unsigned)(r[i] + g[i] + b[i]) < 150;
+    }
+
+    *brown = brown_cnt;
+    *dark = dark_cnt;
+}
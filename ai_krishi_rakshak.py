@@ -7,130 +7,478 @@ An AI-driven assistant for farmers to:
 3. Guide farmers with local-language instructions (English, Hindi, Kannada).
 4. Track effectiveness of treatments.
 5. Promote confidence in Natural Farming with measurable results.
+
+Setup:
+    pip install numpy
+    CC="cc -mavx2" pip install -U --force-reinstall pillow-simd
+    cc -O3 -mavx2 -mpopcnt -shared -fPIC -o _krishi_simd.so _krishi_simd.c   # optional
+    pip install PyTurboJPEG   # optional, needs the libturbojpeg system library
+
+Pillow-SIMD is a drop-in replacement for Pillow (same `PIL` import); its
+AVX2 JPEG decode and YCbCr→RGB conversion make image loading in
+`detect_pests` several times faster on large farm photos. Stock Pillow
+still works, just slower. With PyTurboJPEG, JPEGs skip PIL entirely and
+decode straight into a NumPy array. The optional `_krishi_simd.so` kernel
+counts damaged pixels in a single AVX2 pass; OpenCV, numba or plain NumPy
+are used, in that order, when it isn't built.
 """
 
 import numpy as np
 from PIL import Image
-import random
+import contextlib
+import copy
+import ctypes
+import functools
 import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to NumPy masks
+    njit = None
+
+try:
+    import cv2
+except ImportError:  # OpenCV is optional; fall back to NumPy masks
+    cv2 = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the report falls back to stdlib json
+    orjson = None
+
+try:
+    import cupy
+except ImportError:  # CuPy is optional; batch diagnosis then runs image by image on the CPU
+    cupy = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJFLAG_STOPONWARNING
+    _TJ = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # PyTurboJPEG or libturbojpeg missing; JPEGs go through PIL
+    _TJ = None
+
+try:  # optional AVX2 kernel built from _krishi_simd.c
+    _simd = ctypes.CDLL(os.path.join(os.path.dirname(os.path.abspath(__file__)), "_krishi_simd.so"))
+except OSError:
+    _simd = None
+else:
+    _simd.count_damage.argtypes = [ctypes.c_void_p] * 3 + [ctypes.c_size_t] + [ctypes.POINTER(ctypes.c_uint64)] * 2
+    _simd.count_damage.restype = None
 
 # ------------------------------------------------------------
 # 1️⃣ DETECT & DIAGNOSE PESTS
 # ------------------------------------------------------------
-def detect_pests(image_path):
-    """Simulated pest detection using color ratios."""
+# Images are shrunk to fit this box before classification; the damage ratio
+# is a coarse statistic and barely changes, while pixel work drops 20-100x.
+ANALYSIS_SIZE = (512, 512)
+
+# Damage-ratio bucket edges and the pest / life-stage label for each bucket.
+SEVERITY_THRESHOLDS = np.array([0.05, 0.15])
+PESTS = (
+    "No significant pest",
+    "Early leaf miner or minor chewing pest",
+    "Severe leaf miner / caterpillar infestation",
+)
+LIFE_STAGES = ("N/A", "early", "advanced")
+
+# Default (t_r, t_g, t_b, t_dark): brown is r > t_r and g < t_g and b < t_b; dark is r + g + b < t_dark.
+DAMAGE_THRESHOLDS = (100, 80, 60, 150)
+
+# Inputs detect_pests treats as file paths (and memoizes); anything else must be a binary file object.
+_PATH_TYPES = (str, bytes, os.PathLike)
+
+# Magic bytes of the formats farm photos come in: JPEG, PNG, WebP (RIFF container).
+_IMAGE_MAGIC = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"RIFF")
+
+# What a missing, unreadable or undecodable image raises; reported as "Could not open image".
+_DECODE_ERRORS = (OSError, ValueError, TypeError, Image.UnidentifiedImageError)
+
+
+class _UnreadableImage(Exception):
+    """Wraps a decode/IO failure so it isn't confused with a bug in the counters."""
+
+
+def _split_planes(img):
+    """Splits interleaved HxWx3 RGB into three contiguous HxW planes (AoS -> SoA)."""
+    if cv2 is not None:
+        return cv2.split(img)
+    return tuple(np.ascontiguousarray(img.transpose(2, 0, 1)))
+
+
+def _count_damage_numpy(img, t_r=100, t_g=80, t_b=60, t_dark=150):
+    """Counts brown (damaged) and dark (pest) pixels with NumPy masks."""
+    # Unit-stride planes let each compare run as a full-width SIMD loop instead of stride-3 gathers.
+    r, g, b = _split_planes(img)
+    brown = np.count_nonzero((r > t_r) & (g < t_g) & (b < t_b))
+    # mean < 50 == sum < 150; uint8 triples sum exactly in uint16, no float64 upcast.
+    dark = np.count_nonzero(r.astype(np.uint16) + g + b < t_dark)
+    return int(brown), int(dark)
+
+
+# 1x3 transform matrix summing R+G+B per pixel (saturates at 255, which is fine for "< 150").
+_CHANNEL_SUM = np.ones((1, 3), dtype=np.float32)
+
+
+def _count_damage_cv2(img):
+    """Counts brown and dark pixels with OpenCV's SIMD kernels (no boolean temporaries)."""
+    brown = cv2.countNonZero(cv2.inRange(img, (101, 0, 0), (255, 79, 59)))
+    channel_sum = cv2.transform(img, _CHANNEL_SUM)
+    # sum <= 149 -> 255; cv2.compare's Python-scalar overload misreads 1-pixel images as scalars.
+    dark = cv2.countNonZero(cv2.threshold(channel_sum, 149, 255, cv2.THRESH_BINARY_INV)[1])
+    return brown, dark
+
+
+def _count_damage_simd(img):
+    """Counts brown and dark pixels with the AVX2 C kernel over planar R/G/B."""
+    r, g, b = (np.ascontiguousarray(p) for p in _split_planes(img))
+    brown, dark = ctypes.c_uint64(), ctypes.c_uint64()
+    _simd.count_damage(r.ctypes.data, g.ctypes.data, b.ctypes.data, r.size,
+                       ctypes.byref(brown), ctypes.byref(dark))
+    return brown.value, dark.value
+
+
+if njit is not None:
+    @njit(nogil=True, fastmath=True, cache=True)
+    def _count_damage_numba(img, t_r=100, t_g=80, t_b=60, t_dark=150):
+        """Counts brown and dark pixels in a single fused pass over the image."""
+        brown_cnt = 0
+        dark_cnt = 0
+        for y in range(img.shape[0]):
+            for x in range(img.shape[1]):
+                r = np.int32(img[y, x, 0])
+                g = np.int32(img[y, x, 1])
+                b = np.int32(img[y, x, 2])
+                brown_cnt += (r > t_r) & (g < t_g) & (b < t_b)
+                dark_cnt += (r + g + b) < t_dark
+        return brown_cnt, dark_cnt
+
+
+# OpenCV ranks ahead of numba: on a 512x512 image both take well under a millisecond,
+# but numba's first call in every process costs ~0.1 s even with its on-disk cache.
+if _simd is not None:
+    count_damage = _count_damage_simd
+elif cv2 is not None:
+    count_damage = _count_damage_cv2
+elif njit is not None:
+    count_damage = _count_damage_numba
+else:
+    count_damage = _count_damage_numpy
+
+
+def make_detector(t_r=100, t_g=80, t_b=60, t_dark=150):
+    """Returns a brown/dark pixel counter for the given thresholds (see DAMAGE_THRESHOLDS).
+
+    The defaults get the fastest backend above; other thresholds run the numba kernel
+    (compiled once and cached on disk) or the NumPy masks.
+    """
+    if (t_r, t_g, t_b, t_dark) == DAMAGE_THRESHOLDS:
+        return count_damage
+    kernel = _count_damage_numba if njit is not None else _count_damage_numpy
+    return functools.partial(kernel, t_r=t_r, t_g=t_g, t_b=t_b, t_dark=t_dark)
+
+
+# Coarse colour histogram for approximate counting: 32 levels per channel (bin width 8).
+# A bin counts as brown / dark when its centre passes the pixel test.
+HISTOGRAM_BINS = 32
+_BIN_WIDTH = 256 // HISTOGRAM_BINS
+_bin_centres = np.arange(HISTOGRAM_BINS) * _BIN_WIDTH + (_BIN_WIDTH - 1) / 2
+_R, _G, _B = np.meshgrid(_bin_centres, _bin_centres, _bin_centres, indexing="ij")
+
+
+@functools.lru_cache(maxsize=None)
+def _histogram_masks(t_r, t_g, t_b, t_dark):
+    """Brown and dark bin masks for one threshold tuple."""
+    return (_R > t_r) & (_G < t_g) & (_B < t_b), (_R + _G + _B) < t_dark
+
+
+def count_damage_histogram(img, thresholds=DAMAGE_THRESHOLDS):
+    """Approximate brown/dark counts from a 32x32x32 colour histogram (thresholds land on bin centres)."""
+    if cv2 is not None:
+        hist = cv2.calcHist([img], [0, 1, 2], None, [HISTOGRAM_BINS] * 3, [0, 256] * 3)
+    else:
+        r, g, b = ((p // _BIN_WIDTH).astype(np.intp) for p in _split_planes(img))
+        codes = (r * HISTOGRAM_BINS + g) * HISTOGRAM_BINS + b
+        hist = np.bincount(codes.ravel(), minlength=HISTOGRAM_BINS ** 3).reshape((HISTOGRAM_BINS,) * 3)
+    brown_mask, dark_mask = _histogram_masks(*thresholds)
+    brown = hist[brown_mask].sum(dtype=np.float64)
+    dark = hist[dark_mask].sum(dtype=np.float64)
+    return int(brown), int(dark)
+
+
+def classify_severity(damage_ratio):
+    """Branchless bucket index into PESTS / LIFE_STAGES; accepts a scalar or an array of ratios."""
+    return np.searchsorted(SEVERITY_THRESHOLDS, damage_ratio, side="right")
+
+
+def detect_pests(image_path, approximate=False, thresholds=DAMAGE_THRESHOLDS):
+    """Simulated pest detection using color ratios.
+
+    approximate=True counts pixels from a coarse colour histogram instead of exact masks.
+    thresholds overrides the brown/dark pixel tests, as (t_r, t_g, t_b, t_dark).
+    """
+    thresholds = tuple(thresholds)  # hashable cache key
     try:
-        img = Image.open(image_path).convert("RGB")
-        np_img = np.array(img)
-    except Exception as e:
+        if isinstance(image_path, _PATH_TYPES):
+            st = os.stat(image_path)
+            # Cached per file version; hand out a copy so callers can't mutate the cache entry.
+            return copy.deepcopy(_detect_pests_cached(image_path, st.st_mtime_ns, st.st_size, approximate, thresholds))
+        return _analyze_image(image_path, approximate, thresholds)  # file objects can't be cache keys
+    except (OSError, ValueError) as e:  # os.stat: missing file, bad path
         return {"error": f"Could not open image: {e}"}
+    except _UnreadableImage as e:
+        return {"error": f"Could not open image: {e.__cause__}"}
 
-    total_pixels = np_img.shape[0] * np_img.shape[1]
-    brown = np.sum((np_img[:, :, 0] > 100) & (np_img[:, :, 1] < 80) & (np_img[:, :, 2] < 60))
-    dark = np.sum(np.mean(np_img, axis=2) < 50)
 
-    damage_ratio = (brown + dark) / total_pixels
-    confidence = round(random.uniform(0.5, 0.9), 2)
-
-    if damage_ratio < 0.05:
-        pest = "No significant pest"
-        life_stage = "N/A"
-    elif damage_ratio < 0.15:
-        pest = "Early leaf miner or minor chewing pest"
-        life_stage = "early"
+@functools.lru_cache(maxsize=128)
+def _detect_pests_cached(image_path, mtime_ns, size, approximate, thresholds):
+    """Cached _analyze_image keyed on (path, mtime, size) so edits invalidate it.
+
+    Failures raise instead of returning an error dict, so lru_cache never stores them.
+    """
+    return _analyze_image(image_path, approximate, thresholds)
+
+
+def _analyze_image(source, approximate, thresholds=DAMAGE_THRESHOLDS):
+    """Decodes and classifies one image; raises _UnreadableImage if it can't be read."""
+    try:
+        np_img = _load_image(source)
+    except _DECODE_ERRORS as e:
+        raise _UnreadableImage() from e
+    if approximate:
+        brown, dark = count_damage_histogram(np_img, thresholds)
     else:
-        pest = "Severe leaf miner / caterpillar infestation"
-        life_stage = "advanced"
+        brown, dark = make_detector(*thresholds)(np_img)
+    return _diagnose(brown, dark, np_img.shape[0] * np_img.shape[1])
+
+
+def _load_image(source):
+    """Decodes an image path or binary file into a downsampled uint8 RGB array; raises if unreadable."""
+    # Cheap header sniff so empty / corrupt files are rejected before PIL does any work.
+    if not isinstance(source, _PATH_TYPES) and not hasattr(source, "read"):
+        raise TypeError(f"expected a path or binary file object, got {type(source).__name__}")
+    with open(source, "rb") if isinstance(source, _PATH_TYPES) else contextlib.nullcontext(source) as f:
+        start = f.tell()
+        head = f.read(12)
+        if not head.startswith(_IMAGE_MAGIC) or (head.startswith(b"RIFF") and head[8:12] != b"WEBP"):
+            raise ValueError("unsupported format")
+        if _TJ is not None and head.startswith(b"\xff\xd8\xff"):
+            try:
+                return _fit_analysis_size(Image.fromarray(_decode_jpeg_turbo(head + f.read())))
+            except OSError:
+                pass  # e.g. CMYK JPEGs; let PIL handle them
+
+        # Decode + RGB conversion dominate runtime; Pillow-SIMD runs them on AVX2.
+        f.seek(start)
+        img = Image.open(f)
+        img.draft("RGB", ANALYSIS_SIZE)  # JPEG: decode at reduced DCT scale
+        img = img.convert("RGB")
+    return _fit_analysis_size(img)
+
+
+def _fit_analysis_size(img):
+    """Shrinks a PIL RGB image to fit ANALYSIS_SIZE; every decoder goes through here so counts match."""
+    img.thumbnail(ANALYSIS_SIZE, Image.BILINEAR)
+    return np.asarray(img, dtype=np.uint8)  # read-only, skips the extra copy
+
+
+def _decode_jpeg_turbo(data):
+    """Decodes a JPEG with libturbojpeg straight into an RGB array at reduced DCT scale."""
+    width, height = _TJ.decode_header(data)[:2]
+    # Smallest DCT scale that still covers the analysis box (same rule as Image.draft).
+    scales = [(n, d) for n, d in _TJ.scaling_factors
+              if n <= d and width * n >= ANALYSIS_SIZE[0] * d and height * n >= ANALYSIS_SIZE[1] * d]
+    scale = min(scales, key=lambda nd: nd[0] / nd[1]) if scales else (1, 1)
+    # Stop on warnings (e.g. premature end of data): raise OSError and let PIL report it,
+    # rather than diagnosing a partly decoded image.
+    return _TJ.decode(data, pixel_format=TJPF_RGB, scaling_factor=scale, flags=TJFLAG_STOPONWARNING)
+
+
+def _diagnose(brown, dark, total_pixels):
+    """Turns brown/dark pixel counts into the diagnosis dict."""
+    brown, dark = int(brown), int(dark)
+    damage_ratio = (brown + dark) / total_pixels
+    # Deterministic 0.5-0.9 score mixed from the pixel stats (Knuth multiplicative hash),
+    # so the same image always reports the same confidence.
+    confidence = round(0.5 + 0.4 * ((brown * 2654435761 + dark) & 0xFFFF) / 65535, 2)
+
+    idx = int(classify_severity(damage_ratio))
 
     return {
-        "pest": pest,
-        "life_stage": life_stage,
+        "pest": PESTS[idx],
+        "life_stage": LIFE_STAGES[idx],
         "confidence": confidence,
         "severity": round(damage_ratio, 3),
-        "pixels": {"total": total_pixels, "brown": int(brown), "dark": int(dark)}
+        "pixels": {"total": total_pixels, "brown": brown, "dark": dark}
     }
 
+
+if cupy is not None:
+    _damage_kernel = cupy.ElementwiseKernel(
+        "uint8 r, uint8 g, uint8 b",
+        "uint8 brown, uint8 dark",
+        "brown = (r > 100) && (g < 80) && (b < 60); dark = (r + g + b) < 150;",
+        "krishi_damage",
+    )
+
+
+def _segment_sums(mask, bounds):
+    """Sums a flat GPU mask over consecutive [bounds[i], bounds[i+1]) segments."""
+    csum = cupy.concatenate((cupy.zeros(1, dtype=cupy.int64), cupy.cumsum(mask, dtype=cupy.int64)))
+    return cupy.diff(csum[bounds]).get()
+
+
+def detect_pests_batch(image_paths):
+    """Diagnoses many images (e.g. a whole field) at once; pixel counting is one CUDA launch with CuPy."""
+    if cupy is None:
+        return [detect_pests(path) for path in image_paths]
+
+    results = [None] * len(image_paths)
+    images, slots = [], []
+    for i, path in enumerate(image_paths):
+        try:
+            images.append(_load_image(path))
+            slots.append(i)
+        except _DECODE_ERRORS as e:
+            results[i] = {"error": f"Could not open image: {e}"}
+    if not images:
+        return results
+
+    # Images differ in shape, so pack every pixel into one flat buffer (one H2D copy)
+    # and reduce per image over its segment.
+    sizes = [img.shape[0] * img.shape[1] for img in images]
+    pixels = cupy.asarray(np.concatenate([img.reshape(-1, 3) for img in images]))
+    brown, dark = _damage_kernel(pixels[:, 0], pixels[:, 1], pixels[:, 2])
+    bounds = cupy.asarray(np.cumsum([0] + sizes))
+    brown_counts = _segment_sums(brown, bounds)
+    dark_counts = _segment_sums(dark, bounds)
+
+    for slot, b, d, n in zip(slots, brown_counts, dark_counts, sizes):
+        results[slot] = _diagnose(b, d, n)
+    return results
+
 # ------------------------------------------------------------
 # 2️⃣ RECOMMEND NATURAL TREATMENTS (with translations)
 # ------------------------------------------------------------
-def recommend_natural_treatment(pest_name, lang="en"):
-    """Suggests natural pest control remedies with multilingual support."""
-    treatments = {
-        "leaf miner": {
-            "en": {
-                "title": "Neem Oil Spray",
-                "details": "Mix 50 ml neem oil + 5 g soap in 1L water; spray every 7 days.",
-                "type": "bio-pesticide",
-                "notes": "Targets larvae without harming beneficial insects."
-            },
-            "hi": {
-                "title": "नीम तेल छिड़काव",
-                "details": "50 मिली नीम तेल + 5 ग्राम साबुन को 1 लीटर पानी में मिलाएं; हर 7 दिन में छिड़काव करें।",
-                "type": "जैव कीटनाशक",
-                "notes": "लार्वा को निशाना बनाता है और लाभदायक कीड़ों को नुकसान नहीं पहुंचाता।"
-            },
-            "kn": {
-                "title": "ನೀಮ್ ಎಣ್ಣೆ ಸಿಂಪಡಣೆ",
-                "details": "50 ಮಿ.ಲೀ. ನೀಮ್ ಎಣ್ಣೆ + 5 ಗ್ರಾಂ ಸಾಬೂನು 1 ಲೀಟರ್ ನೀರಿನಲ್ಲಿ ಮಿಶ್ರಣಿಸಿ; ಪ್ರತಿ 7 ದಿನಗಳಿಗೊಮ್ಮೆ ಸಿಂಪಡಿಸಿ.",
-                "type": "ಜೈವ ಕೀಟನಾಶಕ",
-                "notes": "ಉಪಯುಕ್ತ ಕೀಟಗಳಿಗೆ ಹಾನಿ ಮಾಡದೆ ಲಾರ್ವಾಗಳನ್ನು ಗುರಿಯಾಗಿಸುತ್ತದೆ."
-            }
+_TREATMENTS = {
+    "leaf miner": {
+        "en": {
+            "title": "Neem Oil Spray",
+            "details": "Mix 50 ml neem oil + 5 g soap in 1L water; spray every 7 days.",
+            "type": "bio-pesticide",
+            "notes": "Targets larvae without harming beneficial insects."
+        },
+        "hi": {
+            "title": "नीम तेल छिड़काव",
+            "details": "50 मिली नीम तेल + 5 ग्राम साबुन को 1 लीटर पानी में मिलाएं; हर 7 दिन में छिड़काव करें।",
+            "type": "जैव कीटनाशक",
+            "notes": "लार्वा को निशाना बनाता है और लाभदायक कीड़ों को नुकसान नहीं पहुंचाता।"
+        },
+        "kn": {
+            "title": "ನೀಮ್ ಎಣ್ಣೆ ಸಿಂಪಡಣೆ",
+            "details": "50 ಮಿ.ಲೀ. ನೀಮ್ ಎಣ್ಣೆ + 5 ಗ್ರಾಂ ಸಾಬೂನು 1 ಲೀಟರ್ ನೀರಿನಲ್ಲಿ ಮಿಶ್ರಣಿಸಿ; ಪ್ರತಿ 7 ದಿನಗಳಿಗೊಮ್ಮೆ ಸಿಂಪಡಿಸಿ.",
+            "type": "ಜೈವ ಕೀಟನಾಶಕ",
+            "notes": "ಉಪಯುಕ್ತ ಕೀಟಗಳಿಗೆ ಹಾನಿ ಮಾಡದೆ ಲಾರ್ವಾಗಳನ್ನು ಗುರಿಯಾಗಿಸುತ್ತದೆ."
+        }
+    },
+    "caterpillar": {
+        "en": {
+            "title": "Bt Spray (Bacillus thuringiensis)",
+            "details": "Dilute 2g Bt powder per liter; apply in evening hours.",
+            "type": "microbial pesticide",
+            "notes": "Highly specific and environmentally safe."
+        },
+        "hi": {
+            "title": "बीटी छिड़काव (बैसिलस थ्यूरिनजेंसिस)",
+            "details": "प्रति लीटर 2 ग्राम बीटी पाउडर घोलें; शाम के समय छिड़काव करें।",
+            "type": "सूक्ष्मजीव कीटनाशक",
+            "notes": "अत्यधिक विशिष्ट और पर्यावरण के लिए सुरक्षित।"
+        },
+        "kn": {
+            "title": "ಬಿ.ಟಿ. ಸಿಂಪಡಣೆ (Bacillus thuringiensis)",
+            "details": "ಪ್ರತಿ ಲೀಟರ್‌ಗೆ 2 ಗ್ರಾಂ ಬಿ.ಟಿ. ಪುಡಿ ಕರಗಿಸಿ; ಸಂಜೆ ಸಮಯದಲ್ಲಿ ಅನ್ವಯಿಸಿ.",
+            "type": "ಸೂಕ್ಷ್ಮಾಣು ಕೀಟನಾಶಕ",
+            "notes": "ಬಹಳ ನಿಖರವಾದ ಮತ್ತು ಪರಿಸರಕ್ಕೆ ಸುರಕ್ಷಿತ."
+        }
+    },
+    "default": {
+        "en": {
+            "title": "Garlic-Chili Spray",
+            "details": "Crush 50g garlic + 20g green chili in 1L water, filter & spray.",
+            "type": "natural repellent",
+            "notes": "Effective against early-stage chewing pests."
         },
-        "caterpillar": {
-            "en": {
-                "title": "Bt Spray (Bacillus thuringiensis)",
-                "details": "Dilute 2g Bt powder per liter; apply in evening hours.",
-                "type": "microbial pesticide",
-                "notes": "Highly specific and environmentally safe."
-            },
-            "hi": {
-                "title": "बीटी छिड़काव (बैसिलस थ्यूरिनजेंसिस)",
-                "details": "प्रति लीटर 2 ग्राम बीटी पाउडर घोलें; शाम के समय छिड़काव करें।",
-                "type": "सूक्ष्मजीव कीटनाशक",
-                "notes": "अत्यधिक विशिष्ट और पर्यावरण के लिए सुरक्षित।"
-            },
-            "kn": {
-                "title": "ಬಿ.ಟಿ. ಸಿಂಪಡಣೆ (Bacillus thuringiensis)",
-                "details": "ಪ್ರತಿ ಲೀಟರ್‌ಗೆ 2 ಗ್ರಾಂ ಬಿ.ಟಿ. ಪುಡಿ ಕರಗಿಸಿ; ಸಂಜೆ ಸಮಯದಲ್ಲಿ ಅನ್ವಯಿಸಿ.",
-                "type": "ಸೂಕ್ಷ್ಮಾಣು ಕೀಟನಾಶಕ",
-                "notes": "ಬಹಳ ನಿಖರವಾದ ಮತ್ತು ಪರಿಸರಕ್ಕೆ ಸುರಕ್ಷಿತ."
-            }
+        "hi": {
+            "title": "लहसुन-मिर्च छिड़काव",
+            "details": "50 ग्राम लहसुन और 20 ग्राम हरी मिर्च को 1 लीटर पानी में पीसकर छानें और छिड़कें।",
+            "type": "प्राकृतिक कीट प्रतिरोधक",
+            "notes": "प्रारंभिक चरण के कीटों के खिलाफ प्रभावी।"
         },
-        "default": {
-            "en": {
-                "title": "Garlic-Chili Spray",
-                "details": "Crush 50g garlic + 20g green chili in 1L water, filter & spray.",
-                "type": "natural repellent",
-                "notes": "Effective against early-stage chewing pests."
-            },
-            "hi": {
-                "title": "लहसुन-मिर्च छिड़काव",
-                "details": "50 ग्राम लहसुन और 20 ग्राम हरी मिर्च को 1 लीटर पानी में पीसकर छानें और छिड़कें।",
-                "type": "प्राकृतिक कीट प्रतिरोधक",
-                "notes": "प्रारंभिक चरण के कीटों के खिलाफ प्रभावी।"
-            },
-            "kn": {
-                "title": "ಬೆಳ್ಳುಳ್ಳಿ-ಮೆಣಸಿನ ಸಿಂಪಡಣೆ",
-                "details": "50 ಗ್ರಾಂ ಬೆಳ್ಳುಳ್ಳಿ ಮತ್ತು 20 ಗ್ರಾಂ ಹಸಿಮೆಣಸನ್ನು 1 ಲೀಟರ್ ನೀರಿನಲ್ಲಿ ರುಬ್ಬಿ ಶೋಧಿಸಿ ಸಿಂಪಡಿಸಿ.",
-                "type": "ಸಹಜ ಕೀಟ ಪ್ರತಿರೋಧಕ",
-                "notes": "ಆರಂಭಿಕ ಹಂತದ ಕೀಟಗಳ ವಿರುದ್ಧ ಪರಿಣಾಮಕಾರಿ."
-            }
+        "kn": {
+            "title": "ಬೆಳ್ಳುಳ್ಳಿ-ಮೆಣಸಿನ ಸಿಂಪಡಣೆ",
+            "details": "50 ಗ್ರಾಂ ಬೆಳ್ಳುಳ್ಳಿ ಮತ್ತು 20 ಗ್ರಾಂ ಹಸಿಮೆಣಸನ್ನು 1 ಲೀಟರ್ ನೀರಿನಲ್ಲಿ ರುಬ್ಬಿ ಶೋಧಿಸಿ ಸಿಂಪಡಿಸಿ.",
+            "type": "ಸಹಜ ಕೀಟ ಪ್ರತಿರೋಧಕ",
+            "notes": "ಆರಂಭಿಕ ಹಂತದ ಕೀಟಗಳ ವಿರುದ್ಧ ಪರಿಣಾಮಕಾರಿ."
         }
     }
+}
+
+
+# Flat (pest_id, lang_id) view of _TREATMENTS: one indexed load instead of nested hashing.
+# Row order follows _TREATMENTS; column 0 (English) is the fallback language.
+TREATMENT_KEYS = tuple(_TREATMENTS)
+LANGUAGES = ("en", "hi", "kn")
+LANG_IDX = {lang: i for i, lang in enumerate(LANGUAGES)}
+_TREATMENTS_FLAT = np.empty((len(TREATMENT_KEYS), len(LANGUAGES)), dtype=object)
+for _i, _key in enumerate(TREATMENT_KEYS):
+    for _j, _lang in enumerate(LANGUAGES):
+        _TREATMENTS_FLAT[_i, _j] = _TREATMENTS[_key][_lang]
+del _i, _key, _j, _lang
+
+# One precompiled case-insensitive pattern per keyword (no lower() copy), tried in
+# TREATMENT_KEYS order so earlier keys win: "leaf miner" beats "caterpillar".
+_DEFAULT_TREATMENT_ID = TREATMENT_KEYS.index("default")
+_KEYWORD_PATTERNS = tuple(
+    (i, re.compile(re.escape(key), re.IGNORECASE))
+    for i, key in enumerate(TREATMENT_KEYS)
+    if i != _DEFAULT_TREATMENT_ID
+)
+
+
+def treatment_id(pest_name):
+    """Maps a pest label to its row in the treatments table."""
+    for row, pattern in _KEYWORD_PATTERNS:
+        if pattern.search(pest_name):
+            return row
+    return _DEFAULT_TREATMENT_ID
+
+
+def _treatment_entry(pest_id, lang):
+    """Treatment for a row (see treatment_id) in the given language, English fallback."""
+    # Copy so callers can't edit the shared table (or desync it from the guidance strings).
+    return dict(_TREATMENTS_FLAT[pest_id, LANG_IDX.get(lang, 0)])
 
-    if "leaf miner" in pest_name.lower():
-        return treatments["leaf miner"].get(lang, treatments["leaf miner"]["en"])
-    elif "caterpillar" in pest_name.lower():
-        return treatments["caterpillar"].get(lang, treatments["caterpillar"]["en"])
-    else:
-        return treatments["default"].get(lang, treatments["default"]["en"])
+
+def recommend_natural_treatment(pest_name, lang="en"):
+    """Suggests natural pest control remedies with multilingual support."""
+    return _treatment_entry(treatment_id(pest_name), lang)
 
 # ------------------------------------------------------------
 # 3️⃣ GUIDE FARMER IN LOCAL LANGUAGE
 # ------------------------------------------------------------
-def guide_farmer(treatment):
-    """Formats the treatment message clearly for farmers."""
-    return f"{treatment['title']} — {treatment['details']} (Note: {treatment['notes']})"
+# Only treatments x languages messages exist, so format them all once at import.
+_GUIDES_FLAT = np.empty(_TREATMENTS_FLAT.shape, dtype=object)
+for _idx, _t in np.ndenumerate(_TREATMENTS_FLAT):
+    _GUIDES_FLAT[_idx] = f"{_t['title']} — {_t['details']} (Note: {_t['notes']})"
+del _idx, _t
+
+
+def guide_farmer(pest_id, lang="en"):
+    """Returns the farmer-facing message for a treatment row (see treatment_id)."""
+    return _GUIDES_FLAT[pest_id, LANG_IDX.get(lang, 0)]
 
 # ------------------------------------------------------------
 # 4️⃣ TRACK EFFECTIVENESS OF TREATMENT
@@ -148,18 +496,25 @@ def track_effectiveness(before, after):
 # 5️⃣ MAIN EXECUTION FUNCTION
 # ------------------------------------------------------------
 def krishi_rakshak(image_before, image_after=None, lang="en"):
-    diagnosis_before = detect_pests(image_before)
+    if image_after:
+        # Independent decode + mask pipelines; PIL/NumPy/OpenCV release the GIL, so threads overlap.
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fb, fa = ex.submit(detect_pests, image_before), ex.submit(detect_pests, image_after)
+            diagnosis_before, diagnosis_after = fb.result(), fa.result()
+    else:
+        diagnosis_before = detect_pests(image_before)
+        diagnosis_after = None
+
     if "error" in diagnosis_before:
         return diagnosis_before
 
-    treatment = recommend_natural_treatment(diagnosis_before["pest"], lang)
-    guide = guide_farmer(treatment)
+    pest_id = treatment_id(diagnosis_before["pest"])
+    treatment = _treatment_entry(pest_id, lang)
+    guide = guide_farmer(pest_id, lang)
 
-    if image_after:
-        diagnosis_after = detect_pests(image_after)
+    if diagnosis_after is not None:
         tracking = track_effectiveness(diagnosis_before, diagnosis_after)
     else:
-        diagnosis_after = None
         tracking = None
 
     return {
@@ -182,4 +537,9 @@ if __name__ == "__main__":
     result = krishi_rakshak(before_path, after_path, lang)
 
     print("\n🧾 AI Krishi Rakshak Report:")
-    print(json.dumps(result, indent=4, ensure_ascii=False))
\ No newline at end of file
+    if orjson is not None:
+        sys.stdout.flush()  # keep ordering with the text already printed
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        sys.stdout.buffer.write(orjson.dumps(result, option=options))
+    else:
+        print(json.dumps(result, indent=4, ensure_ascii=False))
\ No newline at end of file